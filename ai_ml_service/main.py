@@ -1,9 +1,12 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+from functools import lru_cache
+import base64
 import numpy as np
-import pandas as pd
+import orjson
 from datetime import datetime, timedelta
 import uvicorn
 import logging
@@ -17,10 +20,17 @@ import os
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered by orjson, with native NumPy support"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+
 app = FastAPI(
     title="AI/ML Microservice",
     description="AI/ML service for IoT classroom automation system",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -44,7 +54,9 @@ class ScheduleRequest(BaseModel):
 
 class AnomalyRequest(BaseModel):
     device_id: str
-    values: List[float]
+    values: Optional[List[float]] = None
+    # Base64 of raw little-endian float64 bytes; preferred for large batches
+    values_b64: Optional[str] = None
 
 class ForecastResponse(BaseModel):
     device_id: str
@@ -65,61 +77,135 @@ class AnomalyResponse(BaseModel):
     threshold: float
     timestamp: str
 
-# Global models (in production, use proper model management)
+# Global models (in production, use proper model management).
+# Entries record each device's model configuration; every computation
+# fits its own estimator, so memoised results never leave a stored model
+# fitted on a different history.
 models = {}
 
+def create_model(model_type: str):
+    """Create an unfitted ML model of the given type"""
+    if model_type == "forecast":
+        return LinearRegression()
+    elif model_type == "anomaly":
+        return IsolationForest(contamination=0.1, random_state=42)
+    raise ValueError(f"Unknown model type: {model_type}")
+
 def get_or_create_model(device_id: str, model_type: str):
     """Get or create ML model for device"""
     key = f"{device_id}_{model_type}"
     if key not in models:
-        if model_type == "forecast":
-            models[key] = LinearRegression()
-        elif model_type == "anomaly":
-            models[key] = IsolationForest(contamination=0.1, random_state=42)
+        models[key] = create_model(model_type)
     return models[key]
 
+# Dashboards poll with the same short history, so results are memoised
+# per (values, ...). The caps bound memory: each entry keeps
+# its key (up to CACHEABLE_HISTORY_LEN boxed floats, ~16 KB) plus result
+# arrays of at most CACHEABLE_HISTORY_LEN values each (~8 KB), so each
+# cache holds at most ~6 MB per worker. Longer inputs or results are
+# computed without caching.
+CACHEABLE_HISTORY_LEN = 512
+CACHE_MAXSIZE = 256
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    """Freeze an array so cached results can be shared between requests"""
+    array.flags.writeable = False
+    return array
+
+def _as_float_array(values) -> np.ndarray:
+    """Accept a sequence of floats or raw little-endian float64 bytes"""
+    if isinstance(values, bytes):
+        return np.frombuffer(values, dtype="<f8")
+    return np.asarray(values, dtype=np.float64)
+
+def _memoised(func, values, *args, result_len: int = 0):
+    """Call a cached implementation, bypassing the cache for large inputs or results"""
+    # Raw float64 bytes are kept as the key as-is, under the same cap
+    count = len(values) // 8 if isinstance(values, bytes) else len(values)
+    if max(count, result_len) > CACHEABLE_HISTORY_LEN:
+        return func.__wrapped__(values, *args)
+    if not isinstance(values, bytes):
+        values = tuple(values)
+    return func(values, *args)
+
+@lru_cache(maxsize=CACHE_MAXSIZE)
+def _forecast_impl(history: Sequence[float], periods: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Fit a forecast model and return (forecast, confidence)"""
+    y = np.asarray(history, dtype=np.float64)
+
+    # Simple linear regression forecast (can be enhanced with more sophisticated models)
+    X = np.arange(len(y)).reshape(-1, 1)
+
+    model = create_model("forecast")
+    model.fit(X, y)
+
+    # Forecast future periods
+    future_X = np.arange(len(y), len(y) + periods).reshape(-1, 1)
+    forecast = model.predict(future_X)
+
+    # Calculate confidence intervals (simplified)
+    residuals = y - model.predict(X)
+    std_residuals = np.std(residuals)
+    # fmin/fmax (unlike clip) map NaN from 0/0 to the 0.9 upper bound
+    with np.errstate(divide="ignore", invalid="ignore"):
+        confidence = np.fmax(0.1, np.fmin(0.9, 1 - std_residuals / np.abs(forecast)))
+
+    # Ensure forecast values are reasonable (0-100%)
+    forecast = np.clip(forecast, 0, 100)
+
+    return _read_only(forecast), _read_only(confidence)
+
+@lru_cache(maxsize=CACHE_MAXSIZE)
+def _anomaly_impl(values) -> Tuple[np.ndarray, np.ndarray, float]:
+    """Fit an anomaly model and return (anomalies, scores, threshold)"""
+    X = _as_float_array(values).reshape(-1, 1)
+
+    # Use Isolation Forest for anomaly detection
+    model = create_model("anomaly")
+    model.fit(X)
+
+    # Get anomaly scores; predict() is just decision_function() < 0,
+    # so derive the anomaly indices from the scores instead of
+    # walking the forest a second time
+    scores = model.decision_function(X)
+    anomalies = np.flatnonzero(scores < 0)
+
+    # Calculate dynamic threshold based on scores
+    threshold = np.percentile(scores, 10)  # Bottom 10% are anomalies
+
+    return _read_only(anomalies), _read_only(scores), float(threshold)
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
-@app.post("/forecast", response_model=ForecastResponse)
+# /forecast and /anomaly return ORJSONResponse directly so FastAPI skips
+# re-validating NumPy output through the response model; the models are
+# kept in `responses` for the OpenAPI schema
+@app.post("/forecast", responses={200: {"model": ForecastResponse}})
 async def forecast_usage(request: ForecastRequest):
     """Forecast device usage based on historical data"""
     try:
         device_id = request.device_id
-        history = np.array(request.history)
+        history = request.history
         periods = request.periods
 
         if len(history) < 3:
             raise HTTPException(status_code=400, detail="Need at least 3 data points for forecasting")
 
-        # Simple linear regression forecast (can be enhanced with more sophisticated models)
-        X = np.arange(len(history)).reshape(-1, 1)
-        y = history
-
-        model = get_or_create_model(device_id, "forecast")
-        model.fit(X, y)
+        get_or_create_model(device_id, "forecast")
+        forecast, confidence = _memoised(_forecast_impl, history, periods, result_len=periods)
 
-        # Forecast future periods
-        future_X = np.arange(len(history), len(history) + periods).reshape(-1, 1)
-        forecast = model.predict(future_X)
-
-        # Calculate confidence intervals (simplified)
-        residuals = y - model.predict(X)
-        std_residuals = np.std(residuals)
-        confidence = [max(0.1, min(0.9, 1 - (std_residuals / abs(f)))) for f in forecast]
-
-        # Ensure forecast values are reasonable (0-100%)
-        forecast = np.clip(forecast, 0, 100)
-
-        return ForecastResponse(
-            device_id=device_id,
-            forecast=forecast.tolist(),
-            confidence=confidence,
-            timestamp=datetime.now().isoformat()
-        )
+        return ORJSONResponse({
+            "device_id": device_id,
+            "forecast": forecast,
+            "confidence": confidence,
+            "timestamp": datetime.now().isoformat()
+        })
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Forecast error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Forecast failed: {str(e)}")
@@ -173,38 +259,43 @@ async def optimize_schedule(request: ScheduleRequest):
         logger.error(f"Schedule optimization error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Schedule optimization failed: {str(e)}")
 
-@app.post("/anomaly", response_model=AnomalyResponse)
+@app.post("/anomaly", responses={200: {"model": AnomalyResponse}})
 async def detect_anomalies(request: AnomalyRequest):
     """Detect anomalies in device behavior"""
     try:
         device_id = request.device_id
-        values = np.array(request.values).reshape(-1, 1)
-
-        if len(values) < 10:
+        if request.values is not None and request.values_b64 is not None:
+            raise HTTPException(status_code=400, detail="Send either values or values_b64, not both")
+        if request.values_b64 is not None:
+            try:
+                values = base64.b64decode(request.values_b64, validate=True)
+            except ValueError:  # binascii.Error, or non-ASCII input
+                raise HTTPException(status_code=400, detail="values_b64 is not valid base64")
+            if len(values) % 8:
+                raise HTTPException(status_code=400, detail="values_b64 must encode float64 values")
+            count = len(values) // 8
+        elif request.values is not None:
+            values = request.values
+            count = len(values)
+        else:
+            raise HTTPException(status_code=400, detail="Either values or values_b64 is required")
+
+        if count < 10:
             raise HTTPException(status_code=400, detail="Need at least 10 data points for anomaly detection")
 
-        # Use Isolation Forest for anomaly detection
-        model = get_or_create_model(device_id, "anomaly")
-        model.fit(values)
-
-        # Get anomaly scores and predictions
-        scores = model.decision_function(values)
-        predictions = model.predict(values)
-
-        # Convert predictions (-1 for anomaly, 1 for normal) to indices
-        anomalies = [i for i, pred in enumerate(predictions) if pred == -1]
+        get_or_create_model(device_id, "anomaly")
+        anomalies, scores, threshold = _memoised(_anomaly_impl, values)
 
-        # Calculate dynamic threshold based on scores
-        threshold = np.percentile(scores, 10)  # Bottom 10% are anomalies
-
-        return AnomalyResponse(
-            device_id=device_id,
-            anomalies=anomalies,
-            scores=scores.tolist(),
-            threshold=float(threshold),
-            timestamp=datetime.now().isoformat()
-        )
+        return ORJSONResponse({
+            "device_id": device_id,
+            "anomalies": anomalies,
+            "scores": scores,
+            "threshold": threshold,
+            "timestamp": datetime.now().isoformat()
+        })
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Anomaly detection error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Anomaly detection failed: {str(e)}")
@@ -1,7 +1,8 @@
 import pytest
 from fastapi.testclient import TestClient
-from main import app
+from main import app, models, create_model, _forecast_impl, _anomaly_impl, ORJSONResponse, CACHEABLE_HISTORY_LEN
 import numpy as np
+import base64
 from datetime import datetime
 
 client = TestClient(app)
@@ -17,6 +18,12 @@ class TestAIMLService:
         assert data["status"] == "healthy"
         assert "timestamp" in data
 
+    def test_orjson_response_serializes_numpy(self):
+        """Test the default response class encodes NumPy arrays natively"""
+        response = ORJSONResponse({"values": np.arange(3), "score": np.float64(0.5)})
+        assert response.body == b'{"values":[0,1,2],"score":0.5}'
+        assert response.media_type == "application/json"
+
     def test_forecast_success(self):
         """Test successful forecast request"""
         request_data = {
@@ -58,6 +65,13 @@ class TestAIMLService:
         assert "detail" in data
         assert "at least 3 data points" in data["detail"]
 
+    def test_openapi_keeps_response_models(self):
+        """Test raw responses still document their schema in OpenAPI"""
+        paths = client.get("/openapi.json").json()["paths"]
+        for path, model in [("/forecast", "ForecastResponse"), ("/anomaly", "AnomalyResponse")]:
+            schema = paths[path]["post"]["responses"]["200"]["content"]["application/json"]["schema"]
+            assert schema["$ref"].endswith(model)
+
     def test_schedule_success(self):
         """Test successful schedule optimization"""
         request_data = {
@@ -140,6 +154,80 @@ class TestAIMLService:
         assert "detail" in data
         assert "at least 10 data points" in data["detail"]
 
+    def test_anomaly_indices_match_model_predictions(self):
+        """Test anomaly indices agree with the fitted model's predict()"""
+        values = np.random.normal(50, 5, 30).tolist() + [150.0, 5.0]
+
+        request_data = {
+            "device_id": "test_device_predict",
+            "values": values
+        }
+
+        response = client.post("/anomaly", json=request_data)
+        assert response.status_code == 200
+
+        X = np.array(values).reshape(-1, 1)
+        predictions = create_model("anomaly").fit(X).predict(X)
+        expected = [i for i, pred in enumerate(predictions) if pred == -1]
+        assert response.json()["anomalies"] == expected
+
+    def test_anomaly_detection_binary_values(self):
+        """Test anomaly detection with base64-encoded float64 values"""
+        values = np.random.normal(50, 5, 20).tolist() + [150.0, 200.0]
+
+        list_response = client.post("/anomaly", json={
+            "device_id": "test_device_binary",
+            "values": values
+        })
+        binary_response = client.post("/anomaly", json={
+            "device_id": "test_device_binary",
+            "values_b64": base64.b64encode(np.array(values, dtype="<f8").tobytes()).decode()
+        })
+
+        assert binary_response.status_code == 200
+        assert binary_response.json()["anomalies"] == list_response.json()["anomalies"]
+        assert binary_response.json()["scores"] == list_response.json()["scores"]
+
+    def test_anomaly_invalid_binary_values(self):
+        """Test anomaly detection rejects malformed binary payloads"""
+        response = client.post("/anomaly", json={
+            "device_id": "test_device_binary",
+            "values_b64": base64.b64encode(b"\x00" * 12).decode()
+        })
+        assert response.status_code == 400
+
+        response = client.post("/anomaly", json={
+            "device_id": "test_device_binary",
+            "values_b64": "\u00e9" * 8
+        })
+        assert response.status_code == 400
+
+        response = client.post("/anomaly", json={"device_id": "test_device_binary"})
+        assert response.status_code == 400
+
+    def test_anomaly_oversized_binary_values_not_cached(self):
+        """Test binary payloads above the cache cap are not memoised"""
+        values = np.random.normal(50, 5, CACHEABLE_HISTORY_LEN + 1)
+        currsize = _anomaly_impl.cache_info().currsize
+
+        response = client.post("/anomaly", json={
+            "device_id": "test_device_binary_large",
+            "values_b64": base64.b64encode(values.astype("<f8").tobytes()).decode()
+        })
+
+        assert response.status_code == 200
+        assert _anomaly_impl.cache_info().currsize == currsize
+
+    def test_anomaly_rejects_both_value_fields(self):
+        """Test anomaly detection rejects values together with values_b64"""
+        values = [float(i) for i in range(10)]
+        response = client.post("/anomaly", json={
+            "device_id": "test_device_binary",
+            "values": values,
+            "values_b64": base64.b64encode(np.array(values, dtype="<f8").tobytes()).decode()
+        })
+        assert response.status_code == 400
+
     def test_get_model_info(self):
         """Test getting model information for a device"""
         # First train some models by making requests
@@ -187,6 +275,65 @@ class TestAIMLService:
         assert len(data["forecast"]) == 2
         assert all(val == 50.0 for val in data["forecast"])
 
+    def test_forecast_zero_history(self):
+        """Test forecast confidence stays bounded when forecasts are zero"""
+        request_data = {
+            "device_id": "test_device_zero",
+            "history": [0.0, 0.0, 0.0, 0.0],
+            "periods": 2
+        }
+
+        response = client.post("/forecast", json=request_data)
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["forecast"] == [0.0, 0.0]
+        assert data["confidence"] == [0.9, 0.9]
+
+    def test_forecast_repeat_request_is_cached(self):
+        """Test identical forecast requests are served from the cache"""
+        request_data = {
+            "device_id": "test_device_cache",
+            "history": [12.0, 14.0, 16.0, 18.0],
+            "periods": 2
+        }
+
+        first = client.post("/forecast", json=request_data)
+        hits = _forecast_impl.cache_info().hits
+        second = client.post("/forecast", json=request_data)
+
+        assert _forecast_impl.cache_info().hits == hits + 1
+        assert second.json()["forecast"] == first.json()["forecast"]
+        assert second.json()["confidence"] == first.json()["confidence"]
+
+    def test_cached_forecast_leaves_registered_model_unfitted(self):
+        """Test memoised forecasts fit a private model, not the device's entry"""
+        request_data = {
+            "device_id": "test_device_cache_pure",
+            "history": [5.0, 6.0, 7.0],
+            "periods": 1
+        }
+
+        client.post("/forecast", json=request_data)
+        client.post("/forecast", json=request_data)
+
+        assert not hasattr(models["test_device_cache_pure_forecast"], "coef_")
+
+    def test_forecast_large_periods_not_cached(self):
+        """Test forecasts with more periods than the cache cap are not memoised"""
+        request_data = {
+            "device_id": "test_device_cache_large",
+            "history": [1.0, 2.0, 3.0],
+            "periods": CACHEABLE_HISTORY_LEN + 1
+        }
+        currsize = _forecast_impl.cache_info().currsize
+
+        response = client.post("/forecast", json=request_data)
+
+        assert response.status_code == 200
+        assert len(response.json()["forecast"]) == CACHEABLE_HISTORY_LEN + 1
+        assert _forecast_impl.cache_info().currsize == currsize
+
     def test_anomaly_normal_data(self):
         """Test anomaly detection with normal data"""
         # Generate normal data without anomalies
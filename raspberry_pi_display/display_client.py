@@ -64,6 +64,8 @@ class DisplayManager:
         self.font_footer = pygame.freetype.SysFont('Arial', Config.FONT_SIZE_FOOTER)
 
         self.current_content = None
+        self.notices = None  # None until the first content update
+        self.displayed = None  # (notices, index) on screen; render thread only
         self.last_update = datetime.now()
         self.running = True
 
@@ -140,12 +142,12 @@ class DisplayManager:
         # Find the highest priority content to display
         notices = content_data.get('boardNotices', []) + content_data.get('groupContent', [])
 
-        if notices:
-            # Sort by priority (highest first) and pick the first one
-            notices.sort(key=lambda x: x.get('priority', 0), reverse=True)
-            self.display_notice(notices[0])
-        else:
-            self.display_no_content()
+        # Sort by priority (highest first) and keep the merged list so the
+        # render loop doesn't rebuild it every frame. Publishing a new list
+        # object is what tells the render thread to redraw; all pygame
+        # drawing stays on that thread.
+        notices.sort(key=lambda x: x.get('priority', 0), reverse=True)
+        self.notices = notices
 
     def run(self):
         """Main display loop"""
@@ -158,14 +160,20 @@ class DisplayManager:
                     self.running = False
 
             # Update display if we have content
-            if self.current_content:
-                # Check if we need to cycle through multiple notices
-                notices = self.current_content.get('boardNotices', []) + self.current_content.get('groupContent', [])
-                if len(notices) > 1:
-                    # Simple cycling every 10 seconds
-                    cycle_time = 10
-                    notice_index = int(time.time() / cycle_time) % len(notices)
-                    self.display_notice(notices[notice_index])
+            notices = self.notices
+            if notices is not None:
+                # Simple cycling every 10 seconds through multiple notices
+                cycle_time = 10
+                notice_index = int(time.time() / cycle_time) % len(notices) if notices else None
+
+                # Only redraw when the content or the cycle changes, not every frame
+                shown = self.displayed
+                if shown is None or shown[0] is not notices or shown[1] != notice_index:
+                    if notices:
+                        self.display_notice(notices[notice_index])
+                    else:
+                        self.display_no_content()
+                    self.displayed = (notices, notice_index)
 
             clock.tick(30)  # 30 FPS
 
@@ -174,6 +182,10 @@ class DisplayManager:
 class APIManager:
     def __init__(self):
         self.session = requests.Session()
+        # Headers and URLs never change at runtime, so build them once
+        self.session.headers.update(self.get_headers())
+        self.content_url = f"{Config.SERVER_URL}/api/boards/{Config.BOARD_ID}/content"
+        self.status_url = f"{Config.SERVER_URL}/api/boards/{Config.BOARD_ID}"
         self.last_content_update = datetime.now() - timedelta(seconds=Config.CONTENT_UPDATE_INTERVAL)
         self.last_status_update = datetime.now() - timedelta(seconds=Config.STATUS_UPDATE_INTERVAL)
 
@@ -187,8 +199,7 @@ class APIManager:
     def get_board_content(self) -> Optional[Dict[str, Any]]:
         """Fetch board content from the server"""
         try:
-            url = f"{Config.SERVER_URL}/api/boards/{Config.BOARD_ID}/content"
-            response = self.session.get(url, headers=self.get_headers(), timeout=10)
+            response = self.session.get(self.content_url, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
@@ -207,13 +218,12 @@ class APIManager:
     def update_board_status(self, status: str = 'active'):
         """Update board online status"""
         try:
-            url = f"{Config.SERVER_URL}/api/boards/{Config.BOARD_ID}"
             data = {
                 'status': status,
                 'lastSeen': datetime.now().isoformat(),
                 'isOnline': True
             }
-            response = self.session.patch(url, json=data, headers=self.get_headers(), timeout=10)
+            response = self.session.patch(self.status_url, json=data, timeout=10)
 
             if response.status_code == 200:
                 logging.info("Board status updated successfully")